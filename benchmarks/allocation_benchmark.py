@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Allocation benchmark for heading detection on a dense document.
+
+Builds a synthetic PDF (500 pages by default) in which every page carries
+numbered headings in a larger bold font between body lines, reads its pages
+once, and then measures only ``OutlineExtractor.extract_headings``. With
+``--toc-pages`` the document opens with that many contents pages listing
+its first headings, and ``--toc`` turns contents-page detection on:
+
+  candidates  - headings that reach the hierarchy pass
+  peak        - peak Python memory allocated during detection (tracemalloc)
+  time        - best wall-clock time of ``--repeat`` untraced runs
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from pdf_processor import PDFProcessor
+
+
+def build_document(pages: int, headings_per_page: int, body_lines: int,
+                   toc_pages: int = 0) -> bytes:
+    import fitz  # PyMuPDF
+    
+    doc = fitz.open()
+    
+    heading = 0
+    for _ in range(toc_pages):
+        page = doc.new_page()
+        y = 60
+        while y <= 780 and heading < pages * headings_per_page:
+            page_index, heading_index = divmod(heading, headings_per_page)
+            page.insert_text((72, y), f"{page_index + 1}.{heading_index + 1} Section heading "
+                                      f"{page_index}-{heading_index} {'.' * 30} "
+                                      f"{toc_pages + page_index + 1}", fontsize=9)
+            heading += 1
+            y += 12
+    
+    for page_index in range(pages):
+        page = doc.new_page()
+        y = 60
+        for heading_index in range(headings_per_page):
+            number = f"{page_index + 1}.{heading_index + 1}"
+            page.insert_text((72, y), f"{number} Section heading {page_index}-{heading_index}",
+                             fontsize=15, fontname='hebo')
+            y += 22
+            for line_index in range(body_lines):
+                page.insert_text((72, y), f"Body text line {line_index} of section {number} "
+                                          f"with ordinary words in it.", fontsize=9)
+                y += 11
+    
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def measure(processor: PDFProcessor, pages_content: list, repeat: int) -> dict:
+    extractor = processor.outline_extractor
+    
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outline = extractor.extract_headings(pages_content)
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    outline = extractor.extract_headings(pages_content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    return {
+        'candidates': len(outline),
+        'peak_kb': round((peak - baseline) / 1024, 1),
+        'best_ms': round(min(timings) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500, help="pages in the synthetic document")
+    parser.add_argument('--headings', type=int, default=8, help="headings per page")
+    parser.add_argument('--body-lines', type=int, default=5, help="body lines after each heading")
+    parser.add_argument('--toc-pages', type=int, default=0, help="contents pages before the body")
+    parser.add_argument('--toc', action='store_true', help="enable contents-page detection")
+    parser.add_argument('--pipeline', default='accurate', help="detector profile to measure")
+    parser.add_argument('--repeat', type=int, default=3, help="untraced timing runs")
+    parser.add_argument('--output', type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+    
+    processor = PDFProcessor(profile=args.pipeline, detect_toc=args.toc)
+    data = build_document(args.pages, args.headings, args.body_lines, args.toc_pages)
+    _, page_count, pages_content = processor.read_pages(data)
+    
+    results = measure(processor, pages_content, args.repeat)
+    results['pages'] = page_count
+    
+    print(f"{page_count} pages, {results['candidates']} headings")
+    print(f"peak      {results['peak_kb']:>10.1f} KB")
+    print(f"time      {results['best_ms']:>10.1f} ms (best of {args.repeat})")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
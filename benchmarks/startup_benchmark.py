@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for process_pdfs.py.
+
+Every measurement runs in a fresh interpreter so nothing is served from the
+module cache of a previous run:
+
+  interpreter   - ``python -c pass``, the floor no change can go below
+  import        - importing ``process_pdfs`` and everything it pulls in
+  first_result  - import, open one PDF and extract its outline
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    'interpreter': "pass",
+    'import': (
+        "import sys; sys.path.insert(0, {src!r}); sys.path.insert(0, {root!r}); "
+        "import process_pdfs"
+    ),
+    'first_result': (
+        "import sys; sys.path.insert(0, {src!r}); sys.path.insert(0, {root!r}); "
+        "import process_pdfs; from pdf_processor import PDFProcessor; "
+        "PDFProcessor().extract_outline({pdf!r})"
+    ),
+}
+
+
+def time_scenario(code: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help="runs per scenario")
+    parser.add_argument('--pdf', type=Path, default=None,
+                        help="document for the first_result scenario (default: first file in input/)")
+    parser.add_argument('--output', type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+    
+    pdf = args.pdf or next(iter(sorted((ROOT / 'input').glob('*.pdf'))), None)
+    
+    results = {}
+    for name, template in SCENARIOS.items():
+        if name == 'first_result' and pdf is None:
+            continue
+        code = template.format(src=str(ROOT / 'src'), root=str(ROOT), pdf=str(pdf))
+        timings = time_scenario(code, args.runs)
+        results[name] = {
+            'median_ms': round(statistics.median(timings) * 1000, 1),
+            'min_ms': round(min(timings) * 1000, 1),
+            'runs': args.runs,
+        }
+        print(f"{name:<14} median {results[name]['median_ms']:>8.1f} ms   "
+              f"min {results[name]['min_ms']:>8.1f} ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
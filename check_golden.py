@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, 'src')
+
+from golden_harness import GoldenHarness, format_report
+from outline_extractor import PIPELINE_PROFILES
+from pdf_processor import PDFProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare extraction results against golden JSON and time each document.")
+    parser.add_argument("--input", type=Path, default=Path("input"),
+                        help="directory of PDFs (default: input)")
+    parser.add_argument("--golden", type=Path, default=Path("output/repoidentifier"),
+                        help="directory of reference JSON files (default: output/repoidentifier)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="time each document this many times and keep the best")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINE_PROFILES), default="accurate",
+                        help="detector profile to evaluate (default: accurate)")
+    parser.add_argument("--template-cache", type=Path, default=None, metavar="FILE",
+                        help="extract with this template cache; use --repeat 2 or more to check "
+                             "that warm runs match the cold run")
+    parser.add_argument("--report", type=Path, default=None,
+                        help="also write the full report as JSON")
+    args = parser.parse_args()
+    
+    processor = PDFProcessor(profile=args.pipeline, template_cache=args.template_cache)
+    report = GoldenHarness(args.input, args.golden, repeat=args.repeat, processor=processor).run()
+    
+    print(format_report(report))
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    # A run that compared nothing (wrong --golden, renamed inputs) must not pass.
+    if (not report['documents'] or report['identical'] != len(report['documents'])
+            or report['unstable']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
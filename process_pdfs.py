@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
 
+import argparse
+import contextlib
+import logging
 import os
 import sys
 import time
@@ -9,54 +12,215 @@ from pathlib import Path
 # Add src to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from pdf_processor import PDFProcessor
+from pdf_processor import PDFProcessor, parse_page_ranges
+from batch_scheduler import BatchScheduler, RunSummaryWriter
+from discovery import iter_manifest, iter_pdf_files, output_path_for, relative_path
+from outline_extractor import PIPELINE_PROFILES
+from profiling import PROFILE_MODES
 
+# Commit the heading index every this many documents during a batch run.
+INDEX_COMMIT_INTERVAL = 500
 
-def main():
+# Maximum number of per-file lines in the run summary.
+PER_FILE_REPORT_LIMIT = 20
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not an integer")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def positive_float(value: str) -> float:
+    """argparse type for durations that must be greater than zero."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a number")
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract outlines from PDF files.")
+    parser.add_argument("--input", type=Path, default=Path("/app/input"),
+                        help="input root to search for PDFs (default: /app/input)")
+    parser.add_argument("--output", type=Path, default=Path("/app/output"),
+                        help="output root; JSON files mirror the input layout (default: /app/output)")
+    parser.add_argument("--manifest", type=Path, default=None,
+                        help="read PDF paths from this file (one per line) instead of walking --input")
+    parser.add_argument("--no-recursive", action="store_true",
+                        help="only look at the top level of --input")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (default: 1)")
+    parser.add_argument("--chunk-pages", type=positive_int, default=200,
+                        help="split documents longer than this into page chunks when running in parallel")
+    parser.add_argument("--memory-limit", type=int, default=None, metavar="MB",
+                        help="throttle dispatch to keep worker memory under this ceiling")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="record peak RSS and Python allocation peak per document")
+    parser.add_argument("--summary", type=Path, default=None, metavar="FILE",
+                        help="write per-file cost and memory figures and the batch totals as JSON")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINE_PROFILES), default="accurate",
+                        help="detector profile: 'fast' runs font analysis only, "
+                             "'accurate' the full pipeline (default: accurate)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                        help="profile every document with cProfile or the stack sampler")
+    parser.add_argument("--profile-dir", type=Path, default=None,
+                        help="where per-document profiles and the batch report go "
+                             "(default: <output>/profiles)")
+    parser.add_argument("--profile-top", type=int, default=25,
+                        help="number of hot functions in the batch report (default: 25)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, metavar="MS",
+                        help="stack sampling interval in milliseconds (default: 1)")
+    parser.add_argument("--collapsed", action="store_true",
+                        help="also write merged collapsed stacks for flame graphs (sampling only)")
+    parser.add_argument("--toc", action="store_true",
+                        help="recognise table-of-contents pages and use their entries as hints")
+    parser.add_argument("--template-cache", type=Path, default=None, metavar="FILE",
+                        help="reuse heading levels for documents sharing a font template, "
+                             "persisted in this JSON file")
+    parser.add_argument("--index", type=Path, default=None, metavar="DB",
+                        help="also load results into a searchable SQLite heading index")
+    parser.add_argument("--pages", type=parse_page_ranges, default=None, metavar="RANGES",
+                        help="only analyse these 1-based pages, e.g. '1-5,9'")
+    parser.add_argument("--max-pages", type=positive_int, default=None, metavar="N",
+                        help="only analyse the first N pages (of --pages, if given)")
+    parser.add_argument("--time-budget", type=positive_float, default=None, metavar="SECONDS",
+                        help="stop reading pages once this much time per document has passed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("Starting PDF outline extraction...")
     start_time = time.time()
     
-    input_dir = Path("/app/input")
-    output_dir = Path("/app/output")
+    input_dir = args.input
+    output_dir = args.output
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    processor = PDFProcessor()
+    processor = PDFProcessor(profile=args.pipeline, template_cache=args.template_cache,
+                             detect_toc=args.toc)
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+    profile_dir = args.profile_dir or output_dir / "profiles"
+    summary_writer = RunSummaryWriter(args.summary) if args.summary else None
+    scheduler = BatchScheduler(workers=args.workers, chunk_pages=args.chunk_pages,
+                               memory_limit=memory_limit, memory_report=args.memory_report,
+                               pipeline=args.pipeline, profile=args.profile,
+                               profile_dir=profile_dir,
+                               sample_interval=args.sample_interval / 1000,
+                               template_cache=args.template_cache,
+                               limits={'pages': args.pages, 'max_pages': args.max_pages,
+                                       'time_budget': args.time_budget},
+                               detect_toc=args.toc, input_root=input_dir,
+                               report_limit=PER_FILE_REPORT_LIMIT,
+                               report_sink=summary_writer.add if summary_writer else None)
     
-    pdf_files = list(input_dir.glob("*.pdf"))
+    # Files are streamed to the scheduler as they are discovered.
+    if args.manifest:
+        print(f"Reading PDF list from {args.manifest}")
+        pdf_files = iter_manifest(args.manifest, base=input_dir)
+    else:
+        print(f"Scanning {input_dir} for PDF files...")
+        pdf_files = iter_pdf_files(input_dir, recursive=not args.no_recursive)
     
-    if not pdf_files:
-        print("No PDF files found in input directory.")
-        return
-    
-    print(f"Found {len(pdf_files)} PDF file(s) to process:")
-    for pdf_file in pdf_files:
-        print(f"  - {pdf_file.name}")
+    index = None
+    if args.index:
+        # sqlite3 is only loaded when an index is requested.
+        from heading_index import HeadingIndex, document_hash
+        index = HeadingIndex(args.index)
     
     processed_count = 0
-    for pdf_file in pdf_files:
-        try:
-            print(f"\nProcessing: {pdf_file.name}")
-            
-            result = processor.extract_outline(pdf_file)
-            
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            processor.save_result(result, output_file)
-            
-            print(f"✓ Generated: {output_file.name}")
-            processed_count += 1
-            
-        except Exception as e:
-            print(f"✗ Error processing {pdf_file.name}: {str(e)}")
-            
-            continue
+    document_count = 0
+    with contextlib.ExitStack() as stack:
+        if index is not None:
+            stack.callback(index.close)
+            stack.enter_context(index.batch())
+        
+        for pdf_file, result in scheduler.run(pdf_files):
+            document_count += 1
+            try:
+                print(f"\nProcessed: {pdf_file.name}")
+                
+                output_file = output_path_for(pdf_file, input_dir, output_dir)
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                processor.save_result(result, output_file)
+                
+                print(f"✓ Generated: {output_file.relative_to(output_dir)}")
+                processed_count += 1
+                
+                if index is not None:
+                    index.add(document_hash(pdf_file), str(relative_path(pdf_file, input_dir)), result)
+                    if processed_count % INDEX_COMMIT_INTERVAL == 0:
+                        index.commit()
+                
+            except Exception as e:
+                print(f"✗ Error processing {pdf_file.name}: {str(e)}")
+                
+                continue
     
     total_time = time.time() - start_time
+    cost = scheduler.cost_summary()
+    
+    if summary_writer is not None:
+        summary_writer.close(dict(cost, processed=processed_count, total_seconds=round(total_time, 3)))
+    
+    if document_count == 0:
+        print("No PDF files found in input directory.")
+        return
+    
     print(f"\n{'='*50}")
     print(f"Processing complete!")
-    print(f"Files processed: {processed_count}/{len(pdf_files)}")
+    print(f"Files processed: {processed_count}/{document_count}")
     print(f"Total time: {total_time:.2f} seconds")
-    print(f"Average time per file: {total_time/len(pdf_files):.2f} seconds")
+    print(f"Average time per file: {total_time/document_count:.2f} seconds")
+    print(f"Predicted work: {cost['predicted']:.2f}s, actual work: {cost['actual']:.2f}s "
+          f"(cost model scale {cost['scale']})")
+    if cost['failed']:
+        print(f"Failed in a worker: {cost['failed']} file(s), not included in the work figures")
+    if cost['peak_rss'] is not None:
+        print(f"Peak RSS: {cost['peak_rss'] / 1024 / 1024:.1f} MB")
+    # Per-file lines are only useful for small batches.
+    for entry in scheduler.report:
+        if 'error' in entry:
+            print(f"  {entry['file']}: failed ({entry['error']})")
+            continue
+        line = (f"  {entry['file']}: {entry['pages']} pages, "
+                f"predicted {entry['predicted']:.2f}s, actual {entry['actual']:.2f}s")
+        if 'peak_rss' in entry:
+            line += f", peak RSS {entry['peak_rss'] / 1024 / 1024:.1f} MB"
+        if 'peak_traced' in entry:
+            line += f", Python peak {entry['peak_traced'] / 1024 / 1024:.1f} MB"
+        print(line)
+    if cost['documents'] > len(scheduler.report):
+        print(f"  ... and {cost['documents'] - len(scheduler.report)} more file(s)")
+    if args.summary:
+        print(f"Run summary with every file saved to {args.summary}")
+    print(f"Pipeline stages ({args.pipeline}):")
+    for stage, stats in cost['stages'].items():
+        line = f"  {stage:<18} {stats['seconds']:8.3f}s"
+        if stats['candidates']:
+            line += f"  {int(stats['candidates'])} candidates, {int(stats['headings'])} headings"
+        print(line)
+    
+    if scheduler.profile_aggregator is not None:
+        if args.collapsed and args.profile != 'sampling':
+            print("Collapsed stacks need --profile sampling; skipped.")
+        report = scheduler.profile_aggregator.write_report(profile_dir, args.profile_top,
+                                                           collapsed=args.collapsed)
+        print(f"Hot functions ({args.profile}, saved to {profile_dir}):")
+        print(report)
     print(f"{'='*50}")
 
 
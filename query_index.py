@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, 'src')
+
+from heading_index import HeadingIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search headings in a heading index database.")
+    parser.add_argument("database", type=Path, help="index written by process_pdfs.py --index")
+    parser.add_argument("query", nargs="?", help="text the heading should contain")
+    parser.add_argument("--level", choices=["H1", "H2", "H3"], help="only match this heading level")
+    parser.add_argument("--limit", type=int, default=20, help="maximum number of results (default: 20)")
+    parser.add_argument("--raw", action="store_true", help="treat the query as an FTS5 expression")
+    args = parser.parse_args()
+    
+    if not args.database.exists():
+        print(f"Index not found: {args.database}")
+        sys.exit(1)
+    
+    with HeadingIndex(args.database) as index:
+        if not args.query:
+            stats = index.stats()
+            print(f"{stats['documents']} document(s), {stats['headings']} heading(s)")
+            return
+        
+        results = index.search(args.query, level=args.level, limit=args.limit, raw=args.raw)
+    
+    for row in results:
+        print(f"{row['doc_hash'][:12]}  {row['name']:<30} {row['level']}  p{row['page']:<4} {row['text']}")
+    
+    if not results:
+        print("No matching headings.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,537 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from discovery import relative_path
+from pdf_processor import PDFProcessor
+from outline_extractor import merge_stage_stats
+from memory_monitor import PeakMemoryTracker, current_rss
+from profiling import ProfileAggregator, profile_call
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+_worker_processors: Dict[Tuple[str, Optional[str], bool], PDFProcessor] = {}
+
+
+def _get_worker_processor(pipeline: str = 'accurate', template_cache: Optional[str] = None,
+                          detect_toc: bool = False) -> PDFProcessor:
+    key = (pipeline, template_cache, detect_toc)
+    if key not in _worker_processors:
+        _worker_processors[key] = PDFProcessor(
+            profile=pipeline,
+            template_cache=Path(template_cache) if template_cache else None,
+            detect_toc=detect_toc
+        )
+    return _worker_processors[key]
+
+
+def _execute(task: Dict[str, Any]) -> Dict[str, Any]:
+    processor = _get_worker_processor(task['pipeline'], task['template_cache'], task['detect_toc'])
+    
+    if task['chunk'] is None:
+        result = processor.extract_outline(task['path'], **(task['limits'] or {}))
+        return {'result': result, 'stages': dict(processor.stage_stats)}
+    
+    processor.outline_extractor.reset_stats()
+    start, stop = task['chunk']
+    metadata, _, pages_content = processor.read_pages(task['path'], start, stop)
+    return {
+        'metadata': metadata,
+        'pages_content': pages_content,
+        'stages': dict(processor.stage_stats)
+    }
+
+
+def _profile_name(task: Dict[str, Any]) -> str:
+    if task['chunk'] is None:
+        return task['name']
+    return f"{task['name']}.pages{task['chunk'][0] + 1}-{task['chunk'][1]}"
+
+
+def _profiled_execute(task: Dict[str, Any], profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if profile is None:
+        return _execute(task)
+    
+    output_base = Path(profile['dir']) / _profile_name(task)
+    payload, summary = profile_call(profile['mode'], lambda: _execute(task),
+                                    output_base, profile['interval'])
+    payload['profile'] = summary
+    return payload
+
+
+def _run_task(task: Dict[str, Any], measure_memory: bool = False,
+              trace_python: bool = False, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Execute one scheduled task; runs in a worker process or in-process."""
+    start_time = time.perf_counter()
+    
+    if not measure_memory:
+        payload = _profiled_execute(task, profile)
+        payload['elapsed'] = time.perf_counter() - start_time
+        return payload
+    
+    start_rss = current_rss()
+    with PeakMemoryTracker(trace_python=trace_python) as tracker:
+        payload = _profiled_execute(task, profile)
+    
+    payload['elapsed'] = time.perf_counter() - start_time
+    payload['pid'] = os.getpid()
+    payload['start_rss'] = start_rss
+    payload['end_rss'] = current_rss()
+    payload.update(tracker.as_dict())
+    return payload
+
+
+class BatchScheduler:
+    """Longest-processing-time-first scheduler for mixed-size PDF batches.
+    
+    Each file's cost is predicted from its size and a page-count probe, and
+    tasks are dispatched most expensive first so a long document never starts
+    last while other workers sit idle. Documents longer than ``chunk_pages``
+    are read as several page-range tasks; the chunks are merged in page order
+    before heading inference, so the output matches a single-pass extraction.
+    
+    With a ``memory_limit`` (bytes) a task is only dispatched while the last
+    reported RSS of every worker plus the predicted footprint of the tasks in
+    flight leaves room for it, so concurrency drops below ``workers`` when
+    large documents are running and returns to it once they finish. The
+    per-page footprint is learnt from the peaks workers report.
+    
+    Input may be a lazy iterator: files are planned in lookahead windows that
+    start at ``workers`` files and double up to ``window``, so work starts as
+    soon as the first files are discovered and LPT ordering applies within
+    each window.
+    
+    ``profile`` (``'cprofile'`` or ``'sampling'``) profiles every task in the
+    worker that runs it, saving per-document stats under ``profile_dir`` (laid
+    out like the input below ``input_root``) and merging them into
+    ``profile_aggregator`` for a batch-wide report.
+    
+    Per-file cost entries are not kept for the whole run: ``cost_summary()``
+    works from running totals, only the first ``report_limit`` entries stay
+    in ``report``, and every entry is handed to ``report_sink`` if one is set.
+    
+    ``limits`` (``pages``, ``max_pages`` and/or ``time_budget``) is passed to
+    :meth:`PDFProcessor.extract_outline` for partial extraction; such
+    documents are never split into chunks and are costed by the pages read.
+    """
+    
+    def __init__(self, workers: int = 1, chunk_pages: int = 200,
+                 per_doc: float = 0.02, per_page: float = 0.008, per_mb: float = 0.05,
+                 memory_limit: Optional[int] = None, memory_report: bool = False,
+                 pipeline: str = 'accurate', profile: Optional[str] = None,
+                 profile_dir: Optional[Path] = None, sample_interval: float = 0.001,
+                 window: int = 1024, template_cache: Optional[Path] = None,
+                 limits: Optional[Dict[str, Any]] = None, detect_toc: bool = False,
+                 input_root: Path = Path('.'), report_limit: int = 20,
+                 report_sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        if chunk_pages < 1:
+            raise ValueError("chunk_pages must be at least 1")
+        
+        self.workers = max(1, workers)
+        self.limits = {key: value for key, value in (limits or {}).items() if value is not None} or None
+        self.window = max(1, window)
+        self.pipeline = pipeline
+        self.input_root = input_root
+        self.detect_toc = detect_toc
+        self.template_cache = str(template_cache) if template_cache else None
+        
+        self.profile = None
+        self.profile_aggregator: Optional[ProfileAggregator] = None
+        if profile is not None:
+            self.profile = {
+                'mode': profile,
+                'dir': str(profile_dir or Path('profiles')),
+                'interval': sample_interval
+            }
+            self.profile_aggregator = ProfileAggregator(profile)
+        self.chunk_pages = chunk_pages
+        self.memory_limit = memory_limit
+        self.memory_report = memory_report
+        
+        # Cost model coefficients, in seconds; tune them from cost_summary().
+        self.per_doc = per_doc
+        self.per_page = per_page
+        self.per_mb = per_mb
+        
+        # Memory model, in bytes; mem_per_page is refined as results arrive.
+        self.mem_per_task = 32 * 1024 * 1024
+        self.mem_per_page = 256 * 1024
+        
+        self.report_limit = report_limit
+        self.report_sink = report_sink
+        self.report: List[Dict[str, Any]] = []
+        self._reset_totals()
+        
+        # Id of the next planned document; a file listed twice is planned
+        # twice, and its chunks must not be merged with the other copy's.
+        self._next_document = 0
+    
+    def _reset_totals(self) -> None:
+        self.totals: Dict[str, Any] = {
+            'documents': 0,
+            'failed': 0,
+            'predicted': 0.0,
+            'actual': 0.0,
+            'peak_rss': None,
+            'stages': {}
+        }
+    
+    def probe_page_count(self, pdf_path: Path) -> Optional[int]:
+        """Read the page count without extracting any text."""
+        import fitz  # PyMuPDF
+        
+        try:
+            with fitz.open(pdf_path) as doc:
+                return doc.page_count
+        except Exception:
+            return None
+    
+    def estimate(self, pdf_path: Path) -> Dict[str, Any]:
+        try:
+            size = pdf_path.stat().st_size
+        except OSError:
+            size = 0
+        
+        pages = self.probe_page_count(pdf_path)
+        size_mb = size / (1024 * 1024)
+        
+        # Unreadable files are still scheduled; they fail fast in the worker.
+        predicted = self.per_doc + self.per_mb * size_mb
+        if pages:
+            predicted += self.per_page * self._pages_read(pages)
+        
+        return {
+            'path': pdf_path,
+            'size': size,
+            'pages': pages,
+            'predicted': predicted
+        }
+    
+    def _pages_read(self, pages: int) -> int:
+        if self.limits is None:
+            return pages
+        if 'pages' in self.limits:
+            pages = min(pages, len(self.limits['pages']))
+        if 'max_pages' in self.limits:
+            pages = min(pages, self.limits['max_pages'])
+        return pages
+    
+    def plan(self, pdf_files: Iterable[Path]) -> List[Dict[str, Any]]:
+        """Return the tasks for ``pdf_files`` in dispatch order (largest first)."""
+        tasks = []
+        
+        for pdf_path in pdf_files:
+            estimate = self.estimate(pdf_path)
+            pages = estimate['pages']
+            document = self._next_document
+            self._next_document += 1
+            
+            if self.workers > 1 and self.limits is None and pages and pages > self.chunk_pages:
+                chunks = [(start, min(start + self.chunk_pages, pages))
+                          for start in range(0, pages, self.chunk_pages)]
+            else:
+                chunks = [None]
+            
+            for chunk in chunks:
+                if chunk is None:
+                    cost = estimate['predicted']
+                else:
+                    cost = estimate['predicted'] * (chunk[1] - chunk[0]) / pages
+                
+                tasks.append({
+                    'document': document,
+                    'path': pdf_path,
+                    'name': str(relative_path(pdf_path, self.input_root).with_suffix('')),
+                    'pipeline': self.pipeline,
+                    'template_cache': self.template_cache,
+                    'detect_toc': self.detect_toc,
+                    'limits': self.limits,
+                    'chunk': chunk,
+                    'cost': cost,
+                    'estimate': estimate,
+                    'chunk_count': len(chunks)
+                })
+        
+        tasks.sort(key=lambda task: task['cost'], reverse=True)
+        return tasks
+    
+    def plan_windows(self, pdf_files: Iterable[Path]) -> Iterator[List[Dict[str, Any]]]:
+        """Plan ``pdf_files`` lazily in growing windows, each sorted largest first."""
+        # Order does not matter to a single worker, so it plans one file at a time.
+        size = 1 if self.workers == 1 else min(self.workers, self.window)
+        batch = []
+        
+        for pdf_path in pdf_files:
+            batch.append(pdf_path)
+            if len(batch) >= size:
+                yield self.plan(batch)
+                batch = []
+                if self.workers > 1:
+                    size = min(size * 2, self.window)
+        
+        if batch:
+            yield self.plan(batch)
+    
+    def run(self, pdf_files: Iterable[Path]) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """Process ``pdf_files`` and yield ``(path, result)`` as documents complete."""
+        windows = self.plan_windows(pdf_files)
+        self.report = []
+        self._reset_totals()
+        
+        measure_memory = self.memory_limit is not None or self.memory_report
+        
+        if self.workers == 1:
+            for tasks in windows:
+                for task in tasks:
+                    payload = _run_task(task, measure_memory, self.memory_report, self.profile)
+                    self._collect_profile(payload)
+                    self._record(task['estimate'], payload['elapsed'], [payload])
+                    yield task['path'], payload['result']
+            return
+        
+        # The process pool is only loaded when more than one worker is used.
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        
+        pending_chunks: Dict[int, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = {}
+        in_flight: Dict[Any, Dict[str, Any]] = {}
+        worker_rss: Dict[int, int] = {}
+        tasks: List[Dict[str, Any]] = []
+        exhausted = False
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # Keep at least one task per worker buffered so the tail of a
+                # window is scheduled together with the head of the next.
+                while not exhausted and len(tasks) < self.workers:
+                    window = next(windows, None)
+                    if window is None:
+                        exhausted = True
+                    else:
+                        tasks.extend(window)
+                        tasks.sort(key=lambda task: task['cost'], reverse=True)
+                
+                if not tasks and not in_flight:
+                    break
+                
+                # Tasks are taken from the LPT-sorted list, largest first; under
+                # a memory limit a smaller task may go ahead of one that does
+                # not fit yet.
+                while tasks and len(in_flight) < self.workers:
+                    index = self._next_admissible(tasks, in_flight, worker_rss)
+                    if index is None:
+                        break
+                    task = tasks.pop(index)
+                    future = executor.submit(_run_task, task, measure_memory,
+                                             self.memory_report, self.profile)
+                    in_flight[future] = task
+                
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                
+                for future in finished:
+                    task = in_flight.pop(future)
+                    pdf_path = task['path']
+                    
+                    try:
+                        payload = future.result()
+                    except Exception as e:
+                        logger.error("Error processing PDF %s: %s", pdf_path, e)
+                        task['error'] = str(e)
+                        payload = None
+                    
+                    if payload is not None and measure_memory:
+                        self._observe_memory(task, payload, worker_rss)
+                    
+                    if payload is not None:
+                        self._collect_profile(payload)
+                    
+                    if task['chunk'] is None:
+                        if payload is None:
+                            self._record(task['estimate'], None, [], error=task['error'])
+                            yield pdf_path, self._fallback(pdf_path)
+                            continue
+                        self._record(task['estimate'], payload['elapsed'], [payload])
+                        yield pdf_path, payload['result']
+                        continue
+                    
+                    done = pending_chunks.setdefault(task['document'], [])
+                    done.append((task, payload))
+                    if len(done) < task['chunk_count']:
+                        continue
+                    
+                    del pending_chunks[task['document']]
+                    yield pdf_path, self._merge_chunks(task['estimate'], done)
+    
+    def _collect_profile(self, payload: Dict[str, Any]) -> None:
+        # Stacks are merged here, so drop them from the payload kept for merging.
+        summary = payload.pop('profile', None)
+        if summary is not None and self.profile_aggregator is not None:
+            self.profile_aggregator.add(summary)
+    
+    def _task_pages(self, task: Dict[str, Any]) -> int:
+        if task['chunk'] is not None:
+            return task['chunk'][1] - task['chunk'][0]
+        return self._pages_read(task['estimate']['pages'] or 1)
+    
+    def predict_memory(self, task: Dict[str, Any]) -> int:
+        return int(self.mem_per_task + self.mem_per_page * self._task_pages(task))
+    
+    def _next_admissible(self, tasks: List[Dict[str, Any]], in_flight: Dict[Any, Dict[str, Any]],
+                         worker_rss: Dict[int, int]) -> Optional[int]:
+        """Index of the first task that fits under the memory limit, if any."""
+        if self.memory_limit is None or not in_flight:
+            return 0
+        
+        committed = sum(worker_rss.values())
+        committed += sum(self.predict_memory(task) for task in in_flight.values())
+        
+        for index, task in enumerate(tasks):
+            if committed + self.predict_memory(task) <= self.memory_limit:
+                return index
+        
+        return None
+    
+    def _observe_memory(self, task: Dict[str, Any], payload: Dict[str, Any],
+                        worker_rss: Dict[int, int]) -> None:
+        if payload.get('end_rss') is not None:
+            worker_rss[payload['pid']] = payload['end_rss']
+        
+        if payload.get('peak_rss') is None or payload.get('start_rss') is None:
+            return
+        
+        observed = max(0, payload['peak_rss'] - payload['start_rss']) / self._task_pages(task)
+        # Follow increases immediately, decay slowly after a one-off spike.
+        self.mem_per_page = max(observed, 0.8 * self.mem_per_page + 0.2 * observed)
+    
+    def _merge_chunks(self, estimate: Dict[str, Any],
+                      done: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> Dict[str, Any]:
+        pdf_path = estimate['path']
+        
+        errors = [task['error'] for task, payload in done if payload is None]
+        if errors:
+            self._record(estimate, None, [], error=errors[0])
+            return self._fallback(pdf_path)
+        
+        done.sort(key=lambda item: item[0]['chunk'][0])
+        
+        start_time = time.perf_counter()
+        pages_content = []
+        for _, payload in done:
+            pages_content.extend(payload['pages_content'])
+        
+        processor = _get_worker_processor(self.pipeline, self.template_cache, self.detect_toc)
+        processor.outline_extractor.reset_stats()
+        try:
+            result = processor.build_result(done[0][1]['metadata'], pages_content,
+                                            page_count=estimate['pages'])
+        except Exception as e:
+            logger.error("Error processing PDF %s: %s", pdf_path, e)
+            self._record(estimate, None, [], error=str(e))
+            return self._fallback(pdf_path)
+        
+        elapsed = time.perf_counter() - start_time
+        elapsed += sum(payload['elapsed'] for _, payload in done)
+        
+        payloads = [payload for _, payload in done]
+        payloads.append({'stages': dict(processor.stage_stats)})
+        self._record(estimate, elapsed, payloads)
+        
+        return result
+    
+    def _fallback(self, pdf_path: Path) -> Dict[str, Any]:
+        processor = _get_worker_processor(self.pipeline, self.template_cache, self.detect_toc)
+        result = processor.fallback_result(pdf_path.stem)
+        if self.limits is not None:
+            result['truncated'] = True
+        return result
+    
+    def _record(self, estimate: Dict[str, Any], actual: Optional[float],
+                payloads: List[Dict[str, Any]], error: Optional[str] = None) -> None:
+        """Account for one document; a failed one has an ``error`` and no ``actual`` time."""
+        entry = {
+            'file': estimate['path'].name,
+            'path': str(estimate['path']),
+            'pages': estimate['pages'],
+            'size': estimate['size'],
+            'predicted': round(estimate['predicted'], 4),
+            'actual': round(actual, 4) if actual is not None else None
+        }
+        if error is not None:
+            entry['error'] = error
+        
+        # A chunked document's peak is that of its largest chunk.
+        for key in ('peak_rss', 'peak_traced'):
+            values = [payload[key] for payload in payloads if payload.get(key) is not None]
+            if values:
+                entry[key] = max(values)
+        
+        stages: Dict[str, Dict[str, float]] = {}
+        for payload in payloads:
+            merge_stage_stats(stages, payload.get('stages', {}))
+        entry['stages'] = stages
+        
+        totals = self.totals
+        totals['documents'] += 1
+        # Failed documents stay out of the cost model's totals.
+        if error is not None:
+            totals['failed'] += 1
+        else:
+            totals['predicted'] += entry['predicted']
+            totals['actual'] += entry['actual']
+        if 'peak_rss' in entry:
+            totals['peak_rss'] = max(totals['peak_rss'] or 0, entry['peak_rss'])
+        merge_stage_stats(totals['stages'], stages)
+        
+        if self.report_sink is not None:
+            self.report_sink(entry)
+        if len(self.report) < self.report_limit:
+            self.report.append(entry)
+    
+    def cost_summary(self) -> Dict[str, Any]:
+        """Compare predicted against measured work for the last run.
+        
+        ``scale`` is the factor by which the cost coefficients would have to be
+        multiplied for predictions to match the measured total. ``failed``
+        documents are counted but left out of both totals.
+        """
+        totals = self.totals
+        predicted = totals['predicted']
+        actual = totals['actual']
+        
+        return {
+            'documents': totals['documents'],
+            'failed': totals['failed'],
+            'predicted': round(predicted, 4),
+            'actual': round(actual, 4),
+            'scale': round(actual / predicted, 3) if predicted > 0 else None,
+            'peak_rss': totals['peak_rss'],
+            'stages': totals['stages']
+        }
+
+
+class RunSummaryWriter:
+    """Stream a run's per-file cost and memory entries to a JSON file.
+    
+    Entries are written as the scheduler records them and the batch totals
+    are added on :meth:`close`, so the file can cover any number of
+    documents without holding them in memory.
+    """
+    
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('{\n"files": [')
+        self._count = 0
+    
+    def add(self, entry: Dict[str, Any]) -> None:
+        if self._count:
+            self._file.write(',')
+        self._file.write('\n  ' + json.dumps(entry))
+        self._count += 1
+    
+    def close(self, summary: Dict[str, Any]) -> None:
+        self._file.write('\n],\n"summary": ' + json.dumps(summary, indent=2) + '\n}\n')
+        self._file.close()
@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Output subdirectory for manifest entries that live outside the input root.
+EXTERNAL_DIR = '_external'
+
+
+def iter_pdf_files(root: Path, recursive: bool = True) -> Iterator[Path]:
+    """Yield PDF files under ``root`` as they are found.
+    
+    Directories are walked with ``os.scandir``, which reuses the file type
+    returned by the directory listing instead of a ``stat`` per entry, and
+    nothing is collected up front, so the first file is available
+    immediately however large the tree is.
+    """
+    pending = [str(root)]
+    
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                        elif entry.name.lower().endswith('.pdf') and entry.is_file():
+                            yield Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def iter_manifest(manifest_path: Path, base: Optional[Path] = None) -> Iterator[Path]:
+    """Yield the PDF paths listed in a manifest file, one per line.
+    
+    Blank lines and lines starting with ``#`` are skipped; relative paths
+    are resolved against ``base`` (the input root) when given.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            path = Path(line)
+            if base is not None and not path.is_absolute():
+                path = base / path
+            yield path
+
+
+def relative_path(pdf_path: Path, input_root: Path) -> Path:
+    """``pdf_path`` relative to ``input_root``.
+    
+    Files outside the root are placed under ``_external/`` by their absolute
+    path, so two files with the same name never map to the same output.
+    """
+    try:
+        relative = pdf_path.relative_to(input_root)
+        if '..' not in relative.parts:
+            return relative
+    except ValueError:
+        pass
+    
+    absolute = pdf_path.resolve()
+    try:
+        return absolute.relative_to(input_root.resolve())
+    except ValueError:
+        return Path(EXTERNAL_DIR, *absolute.parts[1:])
+
+
+def output_path_for(pdf_path: Path, input_root: Path, output_root: Path) -> Path:
+    """JSON path for ``pdf_path`` that mirrors its location under ``input_root``."""
+    return output_root / relative_path(pdf_path, input_root).with_suffix('.json')
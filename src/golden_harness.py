@@ -0,0 +1,161 @@
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from pdf_processor import PDFProcessor, colored_text
+
+LEVELS = ['H1', 'H2', 'H3']
+
+
+def compare_outlines(expected: Dict[str, Any], actual: Dict[str, Any]) -> Dict[str, Any]:
+    """Diff an extraction result against its golden file.
+    
+    Headings are matched as ``(level, text, page)`` multisets, so precision and
+    recall per level are independent of ordering; ``identical`` additionally
+    requires the same title and the same outline in the same order.
+    """
+    expected_outline = expected.get('outline', [])
+    actual_outline = actual.get('outline', [])
+    
+    expected_items = Counter((item.get('level'), item.get('text'), item.get('page'))
+                             for item in expected_outline)
+    actual_items = Counter((item.get('level'), item.get('text'), item.get('page'))
+                           for item in actual_outline)
+    matched = expected_items & actual_items
+    
+    levels = {}
+    for level in LEVELS:
+        true_positives = sum(count for key, count in matched.items() if key[0] == level)
+        expected_count = sum(count for key, count in expected_items.items() if key[0] == level)
+        actual_count = sum(count for key, count in actual_items.items() if key[0] == level)
+        
+        levels[level] = {
+            'expected': expected_count,
+            'actual': actual_count,
+            'matched': true_positives,
+            'precision': true_positives / actual_count if actual_count else 1.0,
+            'recall': true_positives / expected_count if expected_count else 1.0
+        }
+    
+    missing = expected_items - actual_items
+    unexpected = actual_items - expected_items
+    
+    return {
+        'identical': expected.get('title') == actual.get('title') and expected_outline == actual_outline,
+        'title_match': expected.get('title') == actual.get('title'),
+        'levels': levels,
+        'missing': [{'level': key[0], 'text': key[1], 'page': key[2]}
+                    for key in missing.elements()],
+        'unexpected': [{'level': key[0], 'text': key[1], 'page': key[2]}
+                       for key in unexpected.elements()]
+    }
+
+
+class GoldenHarness:
+    """Run the extractor over a corpus and check every result against golden JSON.
+    
+    Each document is timed as well, so one run shows both whether a change kept
+    the output identical and what it did to the time per document. Results
+    after the first of ``repeat`` runs must equal it; with a template cache
+    this checks that a warm run reproduces the cold run that taught it.
+    """
+    
+    def __init__(self, input_dir: Path, golden_dir: Path, repeat: int = 1,
+                 processor: Optional[PDFProcessor] = None):
+        self.input_dir = input_dir
+        self.golden_dir = golden_dir
+        self.repeat = max(1, repeat)
+        self.processor = processor or PDFProcessor()
+    
+    def run(self) -> Dict[str, Any]:
+        documents = []
+        unmatched = []
+        
+        for pdf_path in sorted(self.input_dir.glob("*.pdf")):
+            golden_path = self.golden_dir / f"{pdf_path.stem}.json"
+            if not golden_path.exists():
+                unmatched.append(pdf_path.name)
+                continue
+            
+            with open(golden_path, 'r', encoding='utf-8') as f:
+                expected = json.load(f)
+            
+            # Best of ``repeat`` runs keeps scheduler noise out of the timing.
+            timings = []
+            results = []
+            for _ in range(self.repeat):
+                start_time = time.perf_counter()
+                results.append(self.processor.extract_outline(pdf_path))
+                timings.append(time.perf_counter() - start_time)
+            
+            actual = results[0]
+            comparison = compare_outlines(expected, actual)
+            comparison['file'] = pdf_path.name
+            comparison['seconds'] = min(timings)
+            comparison['stable'] = all(result == actual for result in results[1:])
+            documents.append(comparison)
+        
+        return {
+            'documents': documents,
+            'unmatched': unmatched,
+            'identical': sum(1 for doc in documents if doc['identical']),
+            'unstable': [doc['file'] for doc in documents if not doc['stable']],
+            'total_seconds': sum(doc['seconds'] for doc in documents),
+            'levels': self._aggregate_levels(documents)
+        }
+    
+    def _aggregate_levels(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        levels = {}
+        
+        for level in LEVELS:
+            expected = sum(doc['levels'][level]['expected'] for doc in documents)
+            actual = sum(doc['levels'][level]['actual'] for doc in documents)
+            matched = sum(doc['levels'][level]['matched'] for doc in documents)
+            
+            levels[level] = {
+                'precision': matched / actual if actual else 1.0,
+                'recall': matched / expected if expected else 1.0
+            }
+        
+        return levels
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = []
+    
+    for doc in report['documents']:
+        status = colored_text('IDENTICAL', '32') if doc['identical'] else colored_text('DIFFERS', '31')
+        lines.append(f"{doc['file']:<30} {status:<20} {doc['seconds'] * 1000:8.1f} ms")
+        if not doc['stable']:
+            lines.append(colored_text("   repeated runs differ from the first", '31'))
+        
+        if not doc['identical']:
+            if not doc['title_match']:
+                lines.append("   title differs")
+            for level in LEVELS:
+                stats = doc['levels'][level]
+                if stats['expected'] or stats['actual']:
+                    lines.append(f"   {level}: precision {stats['precision']:.3f}, "
+                                 f"recall {stats['recall']:.3f} "
+                                 f"({stats['matched']}/{stats['expected']} expected, "
+                                 f"{stats['actual']} extracted)")
+            for item in doc['missing'][:3]:
+                lines.append(f"   - missing    {item['level']} p{item['page']}: {item['text']}")
+            for item in doc['unexpected'][:3]:
+                lines.append(f"   + unexpected {item['level']} p{item['page']}: {item['text']}")
+    
+    for name in report.get('unmatched', []):
+        lines.append(f"{name:<30} {colored_text('NO GOLDEN', '33')}")
+    
+    lines.append("=" * 60)
+    lines.append(f"Identical: {report['identical']}/{len(report['documents'])}")
+    if report['unstable']:
+        lines.append(f"Unstable across repeats: {', '.join(report['unstable'])}")
+    for level in LEVELS:
+        stats = report['levels'][level]
+        lines.append(f"{level}: precision {stats['precision']:.3f}, recall {stats['recall']:.3f}")
+    lines.append(f"Total extraction time: {report['total_seconds']:.3f} s")
+    
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_hash TEXT PRIMARY KEY,
+    name TEXT,
+    title TEXT
+);
+
+CREATE TABLE IF NOT EXISTS headings (
+    id INTEGER PRIMARY KEY,
+    doc_hash TEXT NOT NULL REFERENCES documents(doc_hash),
+    level TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS headings_doc_page ON headings(doc_hash, page);
+CREATE INDEX IF NOT EXISTS headings_level ON headings(level, doc_hash);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS headings_fts USING fts5(
+    text, content='headings', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS headings_ai AFTER INSERT ON headings BEGIN
+    INSERT INTO headings_fts(rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS headings_ad AFTER DELETE ON headings BEGIN
+    INSERT INTO headings_fts(headings_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def document_hash(source: Union[str, Path, bytes, bytearray, memoryview]) -> str:
+    """SHA-256 of a PDF, read from disk in blocks or taken from a buffer."""
+    digest = hashlib.sha256()
+    
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+        return digest.hexdigest()
+    
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    
+    return digest.hexdigest()
+
+
+def _phrase_query(text: str) -> str:
+    # Quote the input as one FTS5 phrase so characters such as '.', ':' or
+    # '-' in headings are matched literally instead of parsed as syntax.
+    return '"' + text.replace('"', '""') + '"'
+
+
+class HeadingIndex:
+    """SQLite store of extraction results with a full-text index on headings.
+    
+    Documents are keyed by the hash of their PDF bytes, so re-indexing the
+    same file replaces its rows rather than duplicating them. Writes made
+    inside :meth:`batch` share a single transaction.
+    """
+    
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._in_batch = False
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    def __enter__(self) -> 'HeadingIndex':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    @contextmanager
+    def batch(self) -> Iterator['HeadingIndex']:
+        """Group many :meth:`add` calls into one transaction."""
+        self._in_batch = True
+        try:
+            with self.connection:
+                yield self
+        finally:
+            self._in_batch = False
+    
+    def commit(self) -> None:
+        """Commit the writes so far; lets long batches checkpoint periodically."""
+        self.connection.commit()
+    
+    def add(self, doc_hash: str, name: str, result: Dict[str, Any]) -> None:
+        """Store one ``{"title", "outline"}`` result under ``doc_hash``."""
+        cursor = self.connection.cursor()
+        
+        cursor.execute("DELETE FROM headings WHERE doc_hash = ?", (doc_hash,))
+        cursor.execute(
+            "INSERT OR REPLACE INTO documents (doc_hash, name, title) VALUES (?, ?, ?)",
+            (doc_hash, name, result.get('title', ''))
+        )
+        cursor.executemany(
+            "INSERT INTO headings (doc_hash, level, page, text) VALUES (?, ?, ?, ?)",
+            [(doc_hash, item['level'], item['page'], item['text'])
+             for item in result.get('outline', [])]
+        )
+        
+        if not self._in_batch:
+            self.connection.commit()
+    
+    def add_many(self, entries: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """Store ``(doc_hash, name, result)`` entries in a single transaction."""
+        count = 0
+        with self.batch():
+            for doc_hash, name, result in entries:
+                self.add(doc_hash, name, result)
+                count += 1
+        return count
+    
+    def search(self, text: str, level: Optional[str] = None, limit: int = 50,
+               raw: bool = False) -> List[Dict[str, Any]]:
+        """Find headings containing ``text``, best matches first.
+        
+        ``text`` is matched as a phrase unless ``raw`` is set, in which case
+        it is passed through as an FTS5 query expression.
+        """
+        query = text if raw else _phrase_query(text)
+        
+        sql = (
+            "SELECT d.doc_hash, d.name, d.title, h.level, h.page, h.text "
+            "FROM headings_fts "
+            "JOIN headings h ON h.id = headings_fts.rowid "
+            "JOIN documents d ON d.doc_hash = h.doc_hash "
+            "WHERE headings_fts MATCH ?"
+        )
+        params: List[Any] = [query]
+        
+        if level:
+            sql += " AND h.level = ?"
+            params.append(level)
+        
+        sql += " ORDER BY headings_fts.rank LIMIT ?"
+        params.append(limit)
+        
+        columns = ('doc_hash', 'name', 'title', 'level', 'page', 'text')
+        return [dict(zip(columns, row)) for row in self.connection.execute(sql, params)]
+    
+    def outline(self, doc_hash: str) -> List[Dict[str, Any]]:
+        rows = self.connection.execute(
+            "SELECT level, text, page FROM headings WHERE doc_hash = ? ORDER BY page, id",
+            (doc_hash,)
+        )
+        return [{'level': level, 'text': text, 'page': page} for level, text, page in rows]
+    
+    def stats(self) -> Dict[str, int]:
+        documents = self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        headings = self.connection.execute("SELECT COUNT(*) FROM headings").fetchone()[0]
+        return {'documents': documents, 'headings': headings}
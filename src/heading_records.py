@@ -0,0 +1,79 @@
+import re
+from enum import Enum
+from typing import Dict, Any, Optional, Pattern, Tuple, Union
+
+
+class DetectionMethod(str, Enum):
+    """Detector that proposed a heading candidate.
+    
+    Members compare and hash like their string values, so they can be used
+    directly as stage-statistics keys next to the names of custom stages.
+    """
+    FONT_ANALYSIS = 'font_analysis'
+    PATTERN_MATCHING = 'pattern_matching'
+    TOC = 'toc'
+
+
+class PatternKind(Enum):
+    """Text pattern that matched a pattern-matching candidate."""
+    NUMBERED = 1          # "1. Introduction"
+    NUMBERED_SUB = 2      # "1.2 Scope"
+    NUMBERED_SUBSUB = 3   # "1.2.3 Details"
+    ALL_CAPS = 4          # "SUMMARY"
+    ROMAN = 5             # "IV. Results"
+    LETTERED = 6          # "B. Appendix"
+    PARENTHESIZED = 7     # "(a) item"
+    BULLET = 8            # "• item"
+    DASH = 9              # "- item"
+
+
+# Checked in order; the first pattern that matches a line wins.
+HEADING_PATTERNS: Tuple[Tuple[Pattern, PatternKind], ...] = (
+    (re.compile(r'^\d+\.\s+(.+)$'), PatternKind.NUMBERED),
+    (re.compile(r'^\d+\.\d+\s+(.+)$'), PatternKind.NUMBERED_SUB),
+    (re.compile(r'^\d+\.\d+\.\d+\s+(.+)$'), PatternKind.NUMBERED_SUBSUB),
+    (re.compile(r'^[A-Z][A-Z\s]+$'), PatternKind.ALL_CAPS),
+    (re.compile(r'^[IVX]+\.\s+(.+)$'), PatternKind.ROMAN),
+    (re.compile(r'^[A-Z]\.\s+(.+)$'), PatternKind.LETTERED),
+    (re.compile(r'^\([a-z]\)\s+(.+)$'), PatternKind.PARENTHESIZED),
+    (re.compile(r'^•\s+(.+)$'), PatternKind.BULLET),
+    (re.compile(r'^-\s+(.+)$'), PatternKind.DASH),
+)
+
+
+class HeadingCandidate:
+    """One proposed heading, from detection through level assignment.
+    
+    Documents produce a candidate per heading-like line, so records use
+    ``__slots__`` instead of a per-instance dict. ``page`` is filled in once
+    the candidate is attached to its page and ``level`` by the hierarchy
+    pass; only :meth:`to_outline_item` builds the dict that is serialised.
+    """
+    
+    __slots__ = ('text', 'confidence', 'method', 'font_size', 'pattern', 'page', 'level')
+    
+    def __init__(self, text: str, confidence: float, method: Union[DetectionMethod, str],
+                 font_size: Optional[float] = None, pattern: Optional[PatternKind] = None,
+                 page: int = 0):
+        self.text = text
+        self.confidence = confidence
+        self.method = method
+        self.font_size = font_size
+        self.pattern = pattern
+        self.page = page
+        self.level: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, candidate: Dict[str, Any],
+                  method: Union[DetectionMethod, str]) -> 'HeadingCandidate':
+        """Wrap a candidate dict returned by a custom detector stage."""
+        return cls(candidate['text'], candidate.get('confidence', 0),
+                   candidate.get('method', method), font_size=candidate.get('font_size'),
+                   page=candidate.get('page', 0))
+    
+    def to_outline_item(self) -> Dict[str, Any]:
+        return {'level': self.level, 'text': self.text, 'page': self.page}
+    
+    def __repr__(self) -> str:
+        return (f"HeadingCandidate({self.text!r}, confidence={self.confidence}, "
+                f"method={self.method!r}, page={self.page}, level={self.level!r})")
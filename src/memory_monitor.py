@@ -0,0 +1,81 @@
+import os
+import threading
+from typing import Dict, Any, Optional
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    
+    # Without /proc the best available figure is the high-water mark
+    # (kilobytes on Linux, bytes on macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class PeakMemoryTracker:
+    """Measure peak memory while a block of work runs.
+    
+    Process RSS is sampled on a background thread, since the kernel's own
+    high-water mark only ever grows over the life of a worker and so cannot
+    attribute a peak to one document. ``trace_python`` additionally records
+    the tracemalloc peak of Python allocations; it is off by default because
+    tracing slows allocation-heavy code down noticeably.
+    """
+    
+    def __init__(self, trace_python: bool = False, interval: float = 0.01):
+        self.trace_python = trace_python
+        self.interval = interval
+        self.peak_rss: Optional[int] = None
+        self.peak_traced: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _sample(self) -> None:
+        while True:
+            rss = current_rss()
+            if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+                self.peak_rss = rss
+            if self._stop.wait(self.interval):
+                break
+    
+    def __enter__(self) -> 'PeakMemoryTracker':
+        if self.trace_python:
+            import tracemalloc
+            tracemalloc.start()
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        
+        # One final sample in case the work finished between two ticks.
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+        
+        if self.trace_python:
+            import tracemalloc
+            self.peak_traced = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'peak_rss': self.peak_rss,
+            'peak_traced': self.peak_traced
+        }
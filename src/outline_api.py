@@ -0,0 +1,65 @@
+"""In-process API for embedding outline extraction in other programs.
+
+Nothing here writes to disk or to the terminal: results are returned as
+plain ``{"title", "outline"}`` dicts and diagnostics go through the standard
+``logging`` module, which stays silent until :func:`configure_logging` (or the
+host application) installs a handler.
+"""
+import logging
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+from pdf_processor import PDFProcessor, PDFSource
+
+_LOGGER_NAMES = ('pdf_processor', 'outline_extractor')
+
+_processors: Dict[str, PDFProcessor] = {}
+
+# Handler installed by the last configure_logging() call.
+_handler: Optional[logging.Handler] = None
+
+
+def _get_processor(pipeline: str) -> PDFProcessor:
+    if pipeline not in _processors:
+        _processors[pipeline] = PDFProcessor(profile=pipeline)
+    return _processors[pipeline]
+
+
+def extract_outline(source: PDFSource, name: Optional[str] = None,
+                    pipeline: str = 'accurate', pages: Optional[Iterable[int]] = None,
+                    max_pages: Optional[int] = None,
+                    time_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Return the outline dict for a path, bytes-like object or binary file object.
+    
+    ``pages``, ``max_pages`` and ``time_budget`` limit extraction to part of
+    the document; see :meth:`PDFProcessor.extract_outline`.
+    """
+    return _get_processor(pipeline).extract_outline(source, name=name, pages=pages,
+                                                    max_pages=max_pages, time_budget=time_budget)
+
+
+def iter_outlines(sources: Iterable[PDFSource],
+                  pipeline: str = 'accurate') -> Iterator[Tuple[PDFSource, Dict[str, Any]]]:
+    """Yield ``(source, outline)`` pairs, extracting each document on demand."""
+    return _get_processor(pipeline).iter_outlines(sources)
+
+
+def configure_logging(level: Union[int, str] = logging.INFO,
+                      handler: Optional[logging.Handler] = None) -> None:
+    """Opt in to progress messages from the extraction modules.
+    
+    Calling it again replaces the handler installed by the previous call.
+    """
+    global _handler
+    
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    for logger_name in _LOGGER_NAMES:
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level)
+        if _handler is not None:
+            logger.removeHandler(_handler)
+        logger.addHandler(handler)
+    
+    _handler = handler
@@ -1,43 +1,137 @@
 import re
-from typing import Dict, List, Any, Optional, Tuple
-from utils import FontAnalyzer, TextProcessor
+import time
+from collections import Counter
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional, Tuple
+from heading_records import HEADING_PATTERNS, DetectionMethod, HeadingCandidate
+from toc_detector import TOCDetector, entry_key, normalize_heading, strip_numbering
+
+if TYPE_CHECKING:
+    from utils import FontAnalyzer, TextProcessor
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Detector stages run by each pipeline profile, in order. "fast" needs only
+# the structured text pass; "accurate" is the full pipeline.
+PIPELINE_PROFILES = {
+    'fast': ('font_analysis',),
+    'accurate': ('font_analysis', 'pattern_matching'),
+}
+
+# Value a detector sees when its page field is missing.
+PAGE_FIELD_DEFAULTS = {
+    'text_dict': {},
+    'plain_text': '',
+}
+
+
+def merge_stage_stats(target: Dict[str, Dict[str, float]],
+                      other: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Add the per-stage counters of ``other`` into ``target``."""
+    for stage, stats in other.items():
+        totals = target.setdefault(stage, {'seconds': 0.0, 'candidates': 0, 'headings': 0})
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+    return target
 
 
 class OutlineExtractor:
     
-    def __init__(self):
-        self.font_analyzer = FontAnalyzer()
-        self.text_processor = TextProcessor()
-        
-        # Heading detection patterns
-        self.heading_patterns = [
-            r'^\d+\.\s+(.+)$',                    
-            r'^\d+\.\d+\s+(.+)$',                 
-            r'^\d+\.\d+\.\d+\s+(.+)$',           
-            r'^[A-Z][A-Z\s]+$',                
-            r'^[IVX]+\.\s+(.+)$',               
-            r'^[A-Z]\.\s+(.+)$',                  
-            r'^\([a-z]\)\s+(.+)$',             
-            r'^•\s+(.+)$',                     
-            r'^-\s+(.+)$',                     
-        ]
+    # Built-in detectors: stage name -> (method, page field it reads).
+    DETECTORS = {
+        'font_analysis': ('_extract_by_font_analysis', 'text_dict'),
+        'pattern_matching': ('_extract_by_patterns', 'plain_text'),
+    }
+    
+    def __init__(self, profile: str = 'accurate', template_cache: Optional[Path] = None,
+                 detect_toc: bool = False):
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown pipeline profile '{profile}', "
+                             f"expected one of {sorted(PIPELINE_PROFILES)}")
+        
+        self.profile = profile
+        self.detectors: List[Tuple[str, Callable[[Any], List[HeadingCandidate]], str]] = []
+        for stage in PIPELINE_PROFILES[profile]:
+            method, page_field = self.DETECTORS[stage]
+            self.detectors.append((stage, getattr(self, method), page_field))
+        
+        # Per-stage seconds, raw candidates and headings kept after dedupe.
+        self.stage_stats: Dict[str, Dict[str, float]] = {}
+        
+        # Entry lines of contents pages are hidden from the detectors; the
+        # entries become hints checked against the body pages they point to.
+        self.toc_detector = TOCDetector() if detect_toc else None
+        
+        # Optional persistent cache of font-size -> level mappings per template.
+        self.template_cache = template_cache
+        
+        self._font_analyzer: Optional['FontAnalyzer'] = None
+        self._text_processor: Optional['TextProcessor'] = None
+        
+        # Heading detection patterns, compiled once, with the kind each marks.
+        self.heading_patterns = HEADING_PATTERNS
+    
+    @property
+    def font_analyzer(self) -> 'FontAnalyzer':
+        # utils helpers are loaded on first use rather than at import time.
+        if self._font_analyzer is None:
+            from utils import FontAnalyzer
+            self._font_analyzer = FontAnalyzer(cache_path=self.template_cache)
+        return self._font_analyzer
+    
+    @property
+    def text_processor(self) -> 'TextProcessor':
+        if self._text_processor is None:
+            from utils import TextProcessor
+            self._text_processor = TextProcessor()
+        return self._text_processor
+    
+    def add_detector(self, name: str, detect: Callable[[Any], List[Dict[str, Any]]],
+                     page_field: str = 'text_dict') -> None:
+        """Append a custom detector stage.
+        
+        ``detect`` receives the page's ``page_field`` value and returns
+        candidate dicts with at least ``text`` and ``confidence``; they are
+        wrapped in :class:`HeadingCandidate` records as they come out.
+        """
+        def detect_records(value: Any) -> List[HeadingCandidate]:
+            return [HeadingCandidate.from_dict(candidate, name) for candidate in detect(value)]
+        
+        self.detectors.append((name, detect_records, page_field))
+    
+    @property
+    def page_fields(self) -> set:
+        """Page fields the configured stages read; title detection needs text_dict."""
+        return {'text_dict'} | {page_field for _, _, page_field in self.detectors}
+    
+    def reset_stats(self) -> None:
+        self.stage_stats = {}
+    
+    def record_stage(self, stage: str, seconds: float, candidates: int = 0, headings: int = 0) -> None:
+        merge_stage_stats(self.stage_stats, {stage: {
+            'seconds': seconds,
+            'candidates': candidates,
+            'headings': headings
+        }})
     
     def extract_title(self, metadata: Dict, pages_content: List[Dict]) -> str:
 
         if metadata and metadata.get('title'):
             title = metadata['title'].strip()
             if title and len(title) > 3:
-                print(f"  Title from metadata: {title}")
+                logger.info("  Title from metadata: %s", title)
                 return title
         
         if pages_content:
             first_page = pages_content[0]
             title = self._extract_title_from_page(first_page)
             if title:
-                print(f"  Title from first page: {title}")
+                logger.info("  Title from first page: %s", title)
                 return title
         
-        print("  Using filename as title fallback")
+        logger.info("  Using filename as title fallback")
         return "Document Title"
     
     def _extract_title_from_page(self, page_content: Dict) -> Optional[str]:
@@ -110,42 +204,195 @@ class OutlineExtractor:
         
         return score
     
-    def extract_headings(self, pages_content: List[Dict]) -> List[Dict[str, Any]]:
-
+    def extract_headings(self, pages_content: List[Dict], learn_template: bool = True,
+                         page_count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Detect and level the headings of ``pages_content``.
+        
+        With ``learn_template`` off, a template-cache hit is still used but a
+        miss is not stored; partial extractions see too few pages to teach a
+        template its levels. ``page_count`` is the document's length when
+        only part of it was read.
+        """
         headings = []
+        toc_entries = []
+        
+        if page_count is None and pages_content:
+            page_count = max(page_content['page_num'] for page_content in pages_content)
         
         for page_content in pages_content:
             page_num = page_content['page_num']
-            page_headings = self._extract_headings_from_page(page_content)
+            page_headings, page_entries = self._extract_headings_from_page(page_content, page_count)
+            toc_entries.extend(page_entries)
             
             # Add page number to each heading
             for heading in page_headings:
-                heading['page'] = page_num
+                heading.page = page_num
                 headings.append(heading)
         
-        processed_headings = self._process_heading_hierarchy(headings)
+        if toc_entries:
+            start_time = time.perf_counter()
+            hints = self._validated_toc_headings(headings, toc_entries, pages_content)
+            self.record_stage('toc', time.perf_counter() - start_time, headings=len(hints))
+            headings.extend(hints)
         
-        print(f"  Extracted {len(processed_headings)} headings")
-        return processed_headings
+        fingerprint = None
+        cached_levels = None
+        font_size_to_level = {}
+        if self.template_cache is not None:
+            start_time = time.perf_counter()
+            fingerprint = self.font_analyzer.template_fingerprint(pages_content)
+            cached_levels = self.font_analyzer.get_template_levels(fingerprint) if fingerprint else None
+            self.record_stage('template_cache', time.perf_counter() - start_time)
+            
+            if cached_levels:
+                logger.info("  Reusing heading levels of known template %s", fingerprint[:12])
+        
+        start_time = time.perf_counter()
+        if cached_levels:
+            # Known template: levels are looked up, not inferred again.
+            processed_headings = self._process_heading_hierarchy(headings, cached_levels, fixed=True)
+            if learn_template:
+                self.font_analyzer.store_template_levels(fingerprint, cached_levels)
+        else:
+            processed_headings = self._process_heading_hierarchy(headings, font_size_to_level)
+            if fingerprint is not None and learn_template:
+                learned_levels = self._observed_levels(processed_headings)
+                if learned_levels:
+                    self.font_analyzer.store_template_levels(fingerprint, learned_levels)
+                else:
+                    logger.info("  Template %s not cached: its levels do not follow font size",
+                                fingerprint[:12])
+        
+        self.record_stage('hierarchy', time.perf_counter() - start_time)
+        
+        logger.info("  Extracted %d headings", len(processed_headings))
+        return [heading.to_outline_item() for heading in processed_headings]
     
-    def _extract_headings_from_page(self, page_content: Dict) -> List[Dict[str, Any]]:
-        """Extract potential headings from a single page."""
-        text_dict = page_content.get('text_dict', {})
-        plain_text = page_content.get('plain_text', '')
+    def _extract_headings_from_page(self, page_content: Dict, page_count: Optional[int] = None
+                                    ) -> Tuple[List[HeadingCandidate], List[Dict[str, Any]]]:
+        """Extract potential headings and contents entries from a single page."""
+        toc_entries = []
+        if self.toc_detector is not None:
+            start_time = time.perf_counter()
+            toc_entries = self.toc_detector.detect(page_content.get('text_dict', {}), page_count) or []
+            for entry in toc_entries:
+                entry['toc_page'] = page_content['page_num']
+            self.record_stage('toc', time.perf_counter() - start_time, candidates=len(toc_entries))
+        
+        if toc_entries:
+            # Entry lines are not headings of the contents page, so the
+            # detectors never see them; the entry for the contents page
+            # itself is kept, as it is the page's title.
+            start_time = time.perf_counter()
+            entry_keys = {normalize_heading(strip_numbering(entry['text'])) for entry in toc_entries
+                          if entry['target'] != page_content['page_num']}
+            page_content = self._without_entry_lines(page_content, entry_keys)
+            self.record_stage('toc', time.perf_counter() - start_time)
         
         candidates = []
         
-        font_candidates = self._extract_by_font_analysis(text_dict)
-        candidates.extend(font_candidates)
-        
-        pattern_candidates = self._extract_by_patterns(plain_text)
-        candidates.extend(pattern_candidates)
+        for stage, detect, page_field in self.detectors:
+            start_time = time.perf_counter()
+            stage_candidates = detect(page_content.get(page_field, PAGE_FIELD_DEFAULTS.get(page_field)))
+            self.record_stage(stage, time.perf_counter() - start_time, candidates=len(stage_candidates))
+            
+            candidates.extend(stage_candidates)
         
+        start_time = time.perf_counter()
         unique_candidates = self._deduplicate_candidates(candidates)
+        self.record_stage('dedupe', time.perf_counter() - start_time)
         
-        return unique_candidates
+        # Credit each surviving heading to the stage that proposed it.
+        for stage, count in Counter(candidate.method for candidate in unique_candidates).items():
+            self.record_stage(stage, 0.0, headings=count)
+        
+        return unique_candidates, toc_entries
+    
+    def _without_entry_lines(self, page_content: Dict, entry_keys: set) -> Dict:
+        """Copy of ``page_content`` whose text fields leave out contents-entry lines."""
+        def is_entry(text: str) -> bool:
+            return (entry_key(text) in entry_keys
+                    or normalize_heading(strip_numbering(text)) in entry_keys)
+        
+        page_content = dict(page_content)
+        
+        text_dict = page_content.get('text_dict')
+        if text_dict and 'blocks' in text_dict:
+            blocks = []
+            for block in text_dict['blocks']:
+                if 'lines' in block:
+                    lines = [line for line in block['lines']
+                             if not is_entry(''.join(span.get('text', '') for span in line.get('spans', [])))]
+                    if not lines:
+                        continue
+                    block = dict(block, lines=lines)
+                blocks.append(block)
+            page_content['text_dict'] = dict(text_dict, blocks=blocks)
+        
+        if page_content.get('plain_text'):
+            page_content['plain_text'] = '\n'.join(line for line in page_content['plain_text'].split('\n')
+                                                   if not is_entry(line))
+        
+        return page_content
+    
+    def _validated_toc_headings(self, headings: List[HeadingCandidate], toc_entries: List[Dict[str, Any]],
+                                pages_content: List[Dict]) -> List[HeadingCandidate]:
+        """Turn contents entries into headings the detectors missed.
+        
+        Printed page numbers may be offset from physical pages (front matter),
+        so the offset is taken from entries that already match a detected
+        heading. An entry is only added if its text appears as a line on the
+        page it points to; entries already found by the detectors are skipped.
+        """
+        known_pages: Dict[str, set] = {}
+        for heading in headings:
+            for form in (normalize_heading(heading.text),
+                         normalize_heading(strip_numbering(heading.text))):
+                known_pages.setdefault(form, set()).add(heading.page)
+        
+        offsets = Counter()
+        for entry in toc_entries:
+            for page in known_pages.get(normalize_heading(strip_numbering(entry['text'])), ()):
+                offsets[page - entry['target']] += 1
+        offset = offsets.most_common(1)[0][0] if offsets else 0
+        
+        pages_by_num = {page_content['page_num']: page_content for page_content in pages_content}
+        page_lines: Dict[int, set] = {}
+        hints = []
+        seen = set()
+        
+        for entry in toc_entries:
+            page = entry['target'] + offset
+            if page == entry['toc_page'] or page not in pages_by_num:
+                continue
+            
+            bare = normalize_heading(strip_numbering(entry['text']))
+            if len(bare) < 3 or (bare, page) in seen:
+                continue
+            seen.add((bare, page))
+            
+            if page in known_pages.get(bare, ()) or page in known_pages.get(normalize_heading(entry['text']), ()):
+                continue
+            
+            if page not in page_lines:
+                page_lines[page] = self._normalized_lines(pages_by_num[page])
+            if bare not in page_lines[page]:
+                continue
+            
+            hints.append(HeadingCandidate(entry['text'], 1.0, DetectionMethod.TOC, page=page))
+        
+        return hints
+    
+    def _normalized_lines(self, page_content: Dict) -> set:
+        lines = set()
+        for block in page_content.get('text_dict', {}).get('blocks', []):
+            for line in block.get('lines', []):
+                text = ''.join(span.get('text', '') for span in line.get('spans', []))
+                lines.add(normalize_heading(text))
+                lines.add(normalize_heading(strip_numbering(text)))
+        return lines
     
-    def _extract_by_font_analysis(self, text_dict: Dict) -> List[Dict[str, Any]]:
+    def _extract_by_font_analysis(self, text_dict: Dict) -> List[HeadingCandidate]:
         """Extract headings based on font characteristics."""
         candidates = []
         
@@ -200,16 +447,13 @@ class OutlineExtractor:
                     if line_flags & 2**4:  # Bold
                         confidence += 0.5
                     
-                    candidates.append({
-                        'text': line_text,
-                        'confidence': confidence,
-                        'font_size': line_size,
-                        'method': 'font_analysis'
-                    })
+                    candidates.append(HeadingCandidate(line_text, confidence,
+                                                       DetectionMethod.FONT_ANALYSIS,
+                                                       font_size=line_size))
         
         return candidates
     
-    def _extract_by_patterns(self, plain_text: str) -> List[Dict[str, Any]]:
+    def _extract_by_patterns(self, plain_text: str) -> List[HeadingCandidate]:
         """Extract headings based on text patterns."""
         candidates = []
         
@@ -220,8 +464,8 @@ class OutlineExtractor:
             if not line or len(line) < 3:
                 continue
             
-            for pattern in self.heading_patterns:
-                match = re.match(pattern, line)
+            for pattern, kind in self.heading_patterns:
+                match = pattern.match(line)
                 if match:
                     if match.groups():
                         heading_text = match.group(1).strip()
@@ -234,24 +478,21 @@ class OutlineExtractor:
                         if any(char.isdigit() for char in line[:10]):
                             confidence += 0.5
                         
-                        candidates.append({
-                            'text': heading_text,
-                            'confidence': confidence,
-                            'pattern': pattern,
-                            'method': 'pattern_matching'
-                        })
+                        candidates.append(HeadingCandidate(heading_text, confidence,
+                                                           DetectionMethod.PATTERN_MATCHING,
+                                                           pattern=kind))
                     break
         
         return candidates
     
-    def _deduplicate_candidates(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _deduplicate_candidates(self, candidates: List[HeadingCandidate]) -> List[HeadingCandidate]:
         seen_texts = set()
         unique_candidates = []
         
-        candidates.sort(key=lambda x: x.get('confidence', 0), reverse=True)
+        candidates.sort(key=lambda x: x.confidence, reverse=True)
         
         for candidate in candidates:
-            text = candidate['text'].lower().strip()
+            text = candidate.text.lower().strip()
             
             if text in seen_texts:
                 continue
@@ -267,35 +508,88 @@ class OutlineExtractor:
         
         return unique_candidates
     
-    def _process_heading_hierarchy(self, headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _process_heading_hierarchy(self, headings: List[HeadingCandidate],
+                                   font_size_to_level: Optional[Dict[float, str]] = None,
+                                   fixed: bool = False) -> List[HeadingCandidate]:
+        """Assign levels; a pre-seeded ``font_size_to_level`` is extended in place.
+        
+        With ``fixed`` the mapping is a cached template's and is only looked
+        up, never demoted or extended.
+        """
         if not headings:
             return []
         
         sorted_headings = sorted(headings, key=lambda x: (
-            x.get('confidence', 0),
-            x.get('font_size', 0)
+            x.confidence,
+            x.font_size if x.font_size is not None else 0
         ), reverse=True)
         
         processed = []
-        font_size_to_level = {}
+        if font_size_to_level is None:
+            font_size_to_level = {}
         
         for heading in sorted_headings:
-            text = heading['text']
-            font_size = heading.get('font_size', 12)
-            page = heading['page']
-            
-            level = self._determine_heading_level(text, font_size, font_size_to_level)
+            font_size = heading.font_size if heading.font_size is not None else 12
             
-            processed.append({
-                'level': level,
-                'text': text,
-                'page': page
-            })
+            if fixed:
+                heading.level = self._lookup_heading_level(heading.text, font_size, font_size_to_level)
+            else:
+                heading.level = self._determine_heading_level(heading.text, font_size, font_size_to_level)
+            processed.append(heading)
         
-        processed.sort(key=lambda x: x['page'])
+        processed.sort(key=lambda x: x.page)
         
         return processed
     
+    def _observed_levels(self, headings: List[HeadingCandidate]) -> Optional[Dict[float, str]]:
+        """Size -> level table that reproduces the levels ``headings`` were given.
+        
+        The inference pass demotes sizes as larger ones turn up, so its final
+        mapping is not what labelled the early headings. Each size instead
+        takes the level it was given most often, largest size first; if that
+        table would relabel any heading, None is returned and nothing is cached.
+        """
+        levels_by_size: Dict[float, Counter] = {}
+        for heading in headings:
+            if self._numbered_level(heading.text) is None:
+                font_size = heading.font_size if heading.font_size is not None else 12
+                levels_by_size.setdefault(font_size, Counter())[heading.level] += 1
+        
+        if not levels_by_size:
+            return None
+        
+        levels = {font_size: counts.most_common(1)[0][0]
+                  for font_size, counts in sorted(levels_by_size.items(), reverse=True)}
+        for heading in headings:
+            font_size = heading.font_size if heading.font_size is not None else 12
+            if self._lookup_heading_level(heading.text, font_size, levels) != heading.level:
+                return None
+        
+        return levels
+    
+    def _numbered_level(self, text: str) -> Optional[str]:
+        if re.match(r'^\d+\.\s+', text):
+            return 'H1'
+        elif re.match(r'^\d+\.\d+\s+', text):
+            return 'H2'
+        elif re.match(r'^\d+\.\d+\.\d+\s+', text):
+            return 'H3'
+        return None
+    
+    def _lookup_heading_level(self, text: str, font_size: float,
+                              font_size_to_level: Dict[float, str]) -> str:
+        """Level from a fixed mapping; unknown sizes take the nearest known size's level."""
+        level = self._numbered_level(text)
+        if level is not None:
+            return level
+        
+        level = font_size_to_level.get(font_size)
+        if level is not None:
+            return level
+        
+        nearest = min(font_size_to_level, key=lambda size: abs(size - font_size))
+        return font_size_to_level[nearest]
+    
     def _determine_heading_level(self, text: str, font_size: float, 
                                font_size_to_level: Dict[float, str]) -> str:
         """Determine the hierarchy level (H1, H2, H3) for a heading."""
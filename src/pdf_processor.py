@@ -1,55 +1,220 @@
 import json
-import fitz  # PyMuPDF
+import logging
+import time
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union, BinaryIO
 from outline_extractor import OutlineExtractor
 
+if TYPE_CHECKING:
+    import fitz
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+PDFSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
 def colored_text(text: str, color_code: str) -> str:
     return f"\033[{color_code}m{text}\033[0m"
 
 
-class PDFProcessor:
+def _open_document(source: PDFSource) -> "fitz.Document":
+    """Open a PDF from a path, an in-memory buffer or a binary file object."""
+    # PyMuPDF dominates interpreter startup, so it is only loaded once a
+    # document is actually opened.
+    import fitz  # PyMuPDF
+    
+    if isinstance(source, (str, Path)):
+        return fitz.open(source)
+    
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    
+    if hasattr(source, 'read'):
+        return fitz.open(stream=source.read(), filetype="pdf")
+    
+    raise TypeError(f"Unsupported PDF source type: {type(source).__name__}")
+
+
+def parse_page_ranges(spec: str) -> List[int]:
+    """Turn a page selection such as ``"1-3,7"`` into sorted 1-based page numbers."""
+    pages = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        first_page = int(first)
+        last_page = int(last) if last else first_page
+        if first_page < 1 or last_page < first_page:
+            raise ValueError(f"Invalid page range '{part}'")
+        pages.update(range(first_page, last_page + 1))
+    return sorted(pages)
+
+
+def _source_name(source: PDFSource) -> Optional[str]:
+    if isinstance(source, (str, Path)):
+        return Path(source).stem
     
-    def __init__(self):
-        self.outline_extractor = OutlineExtractor()
+    name = getattr(source, 'name', None)
+    if isinstance(name, str):
+        return Path(name).stem
     
-    def extract_outline(self, pdf_path: Path) -> Dict[str, Any]:
+    return None
+
 
+class PDFProcessor:
+    
+    def __init__(self, profile: str = 'accurate', template_cache: Optional[Path] = None,
+                 detect_toc: bool = False):
+        self.outline_extractor = OutlineExtractor(profile=profile, template_cache=template_cache,
+                                                  detect_toc=detect_toc)
+    
+    @property
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage cost of the last extraction, including the read passes."""
+        return self.outline_extractor.stage_stats
+    
+    def extract_outline(self, source: PDFSource, name: Optional[str] = None,
+                        pages: Optional[Iterable[int]] = None, max_pages: Optional[int] = None,
+                        time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Extract the title and outline from a PDF.
+        
+        ``source`` may be a filesystem path, ``bytes``/``bytearray``/``memoryview``
+        holding the PDF, or a binary file object. In-memory sources are parsed
+        without touching the disk. ``name`` is only used for the fallback title
+        when the document cannot be read.
+        
+        For previews the work can be limited to the 1-based page numbers in
+        ``pages``, to the first ``max_pages`` pages (of the selection, if both
+        are given), or to however many pages can be read within
+        ``time_budget`` seconds. Only the selected pages are ever loaded, so
+        the cost does not grow with the document's length. A limited result
+        carries ``"truncated": True`` when some pages were not analysed.
+        """
+        if name is None:
+            name = _source_name(source)
+        
+        partial = pages is not None or max_pages is not None or time_budget is not None
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("max_pages must be at least 1")
+        
+        page_numbers = None
+        if pages is not None:
+            page_numbers = sorted(set(pages))
+            if page_numbers and page_numbers[0] < 1:
+                raise ValueError("Page numbers start at 1")
+            page_numbers = [page - 1 for page in page_numbers[:max_pages]]
+        
+        self.outline_extractor.reset_stats()
+        
         try:
-            doc = fitz.open(pdf_path)
+            if page_numbers is None:
+                metadata, page_count, pages_content = self.read_pages(
+                    source, stop=max_pages, deadline=deadline)
+            else:
+                metadata, page_count, pages_content = self.read_pages(
+                    source, page_numbers=page_numbers, deadline=deadline)
+            
+            result = self.build_result(metadata, pages_content, partial=partial,
+                                       page_count=page_count)
+            if partial:
+                result['truncated'] = len(pages_content) < page_count
+            return result
             
+        except Exception as e:
+            logger.error("Error processing PDF %s: %s", name or '<stream>', e)
+            result = self.fallback_result(name)
+            if partial:
+                result['truncated'] = True
+            return result
+    
+    def read_pages(self, source: PDFSource, start: int = 0, stop: Optional[int] = None,
+                   page_numbers: Optional[List[int]] = None,
+                   deadline: Optional[float] = None) -> Tuple[Dict, int, List[Dict[str, Any]]]:
+        """Read metadata, page count and the text of pages ``[start, stop)``.
+        
+        Page numbers in the returned content stay 1-based and absolute, so
+        chunks read separately can be concatenated in page order.
+        ``page_numbers`` (0-based, ascending) selects individual pages instead
+        of a range; indices past the end are ignored. Once ``deadline`` (a
+        ``time.perf_counter()`` value) has passed, reading stops after the
+        current page, but at least one page is always read.
+        """
+        doc = _open_document(source)
+        
+        try:
             metadata = doc.metadata
             page_count = len(doc)
             
-            print(f"  Document info: {page_count} pages")
+            logger.info("  Document info: %d pages", page_count)
+            
+            if page_numbers is None:
+                if stop is None or stop > page_count:
+                    stop = page_count
+                page_numbers = range(start, stop)
+            
+            # The plain-text pass is only paid for when a detector reads it.
+            need_plain_text = 'plain_text' in self.outline_extractor.page_fields
+            dict_seconds = 0.0
+            text_seconds = 0.0
             
             pages_content = []
-            for page_num in range(page_count):
+            for page_num in page_numbers:
+                if page_num >= page_count:
+                    break
+                if deadline is not None and pages_content and time.perf_counter() >= deadline:
+                    break
+                
                 page = doc[page_num]
                 
+                start_time = time.perf_counter()
                 text_dict = page.get_text("dict")
-                pages_content.append({
+                dict_seconds += time.perf_counter() - start_time
+                
+                page_content = {
                     'page_num': page_num + 1,
-                    'text_dict': text_dict,
-                    'plain_text': page.get_text()
-                })
-            
+                    'text_dict': text_dict
+                }
+                
+                if need_plain_text:
+                    start_time = time.perf_counter()
+                    page_content['plain_text'] = page.get_text()
+                    text_seconds += time.perf_counter() - start_time
+                
+                pages_content.append(page_content)
+        finally:
             doc.close()
-            
-            title = self.outline_extractor.extract_title(metadata, pages_content)
-            outline = self.outline_extractor.extract_headings(pages_content)
-            
-            return {
-                "title": title,
-                "outline": outline
-            }
-            
-        except Exception as e:
-            print(f"Error processing PDF {pdf_path}: {str(e)}")
-            return {
-                "title": pdf_path.stem.replace('_', ' ').title(),
-                "outline": []
-            }
+        
+        self.outline_extractor.record_stage('read:text_dict', dict_seconds)
+        if need_plain_text:
+            self.outline_extractor.record_stage('read:plain_text', text_seconds)
+        
+        return metadata, page_count, pages_content
+    
+    def build_result(self, metadata: Dict, pages_content: List[Dict[str, Any]],
+                     partial: bool = False, page_count: Optional[int] = None) -> Dict[str, Any]:
+        title = self.outline_extractor.extract_title(metadata, pages_content)
+        outline = self.outline_extractor.extract_headings(pages_content, learn_template=not partial,
+                                                          page_count=page_count)
+        
+        return {
+            "title": title,
+            "outline": outline
+        }
+    
+    def fallback_result(self, name: Optional[str]) -> Dict[str, Any]:
+        return {
+            "title": name.replace('_', ' ').title() if name else "Document Title",
+            "outline": []
+        }
+    
+    def iter_outlines(self, sources: Iterable[PDFSource]) -> Iterator[Tuple[PDFSource, Dict[str, Any]]]:
+        """Lazily extract outlines for each source, yielding ``(source, result)`` pairs."""
+        for source in sources:
+            yield source, self.extract_outline(source)
     
     def save_result(self, result: Dict[str, Any], output_path: Path) -> None:
 
@@ -57,20 +222,20 @@ class PDFProcessor:
             is_valid, errors = self._validate_result(result)
             
             if not is_valid:
-                print(f"  {colored_text('Schema validation warnings', '33')} for {output_path.name}:")
+                logger.warning("  %s for %s:", colored_text('Schema validation warnings', '33'), output_path.name)
                 for error in errors[:3]:
-                    print(f"     - {error}")
+                    logger.warning("     - %s", error)
                 if len(errors) > 3:
-                    print(f"     ... and {len(errors) - 3} more warning(s)")
+                    logger.warning("     ... and %d more warning(s)", len(errors) - 3)
             
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(result, f, indent=2, ensure_ascii=False)
                 
             if is_valid:
-                print(f"  {colored_text('Schema validation passed', '32')}")
+                logger.info("  %s", colored_text('Schema validation passed', '32'))
             
         except Exception as e:
-            print(f"Error saving result to {output_path}: {str(e)}")
+            logger.error("Error saving result to %s: %s", output_path, e)
             raise
     
     def _validate_result(self, result: Dict[str, Any]) -> tuple:
@@ -0,0 +1,157 @@
+import io
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, Callable, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pstats
+
+PROFILE_MODES = ('cprofile', 'sampling')
+
+
+def _frame_name(code) -> str:
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+class StackSampler:
+    """Pure-Python sampling profiler for one thread.
+    
+    A background thread snapshots the target thread's stack every
+    ``interval`` seconds and counts identical stacks, root first, which is
+    exactly the collapsed format flame graph tools read. Unlike cProfile it
+    adds no per-call overhead, so timings of small hot helpers stay realistic.
+    """
+    
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+    
+    def __enter__(self) -> 'StackSampler':
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def write_collapsed(stacks: Counter, output_path: Path) -> None:
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def profile_call(mode: str, func: Callable[[], Any], output_base: Path,
+                 interval: float = 0.001) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``func`` under the selected profiler and save its per-document stats.
+    
+    cProfile stats go to ``<output_base>.prof`` (loadable with ``pstats``);
+    sampled stacks go to ``<output_base>.collapsed``. Returns the function's
+    result and a small summary the batch aggregator can merge.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+    
+    output_base.parent.mkdir(parents=True, exist_ok=True)
+    
+    if mode == 'cprofile':
+        # The profilers are only imported once profiling is requested.
+        import cProfile
+        
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func)
+        stats_path = output_base.with_name(output_base.name + '.prof')
+        profiler.dump_stats(str(stats_path))
+        return result, {'mode': mode, 'path': str(stats_path)}
+    
+    with StackSampler(interval) as sampler:
+        result = func()
+    stats_path = output_base.with_name(output_base.name + '.collapsed')
+    write_collapsed(sampler.stacks, stats_path)
+    return result, {'mode': mode, 'path': str(stats_path), 'stacks': sampler.stacks}
+
+
+class ProfileAggregator:
+    """Merge per-document profiles into a batch-wide hot-function report.
+    
+    Profiles are merged as they arrive, so memory grows with the number of
+    distinct functions or stacks, not with the number of documents.
+    """
+    
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.profiles = 0
+        self.stacks: Counter = Counter()
+        self._stats: Optional['pstats.Stats'] = None
+    
+    def add(self, summary: Dict[str, Any]) -> None:
+        self.profiles += 1
+        if 'stacks' in summary:
+            self.stacks.update(summary['stacks'])
+        elif self._stats is None:
+            import pstats
+            
+            self._stats = pstats.Stats(summary['path'])
+        else:
+            self._stats.add(summary['path'])
+    
+    def top_functions(self, limit: int = 25) -> str:
+        if not self.profiles:
+            return "No profiles collected."
+        
+        if self.mode == 'cprofile':
+            stream = io.StringIO()
+            self._stats.stream = stream
+            self._stats.sort_stats('tottime').print_stats(limit)
+            return stream.getvalue()
+        
+        total = sum(self.stacks.values())
+        if not total:
+            return "No samples collected; try a shorter sampling interval."
+        
+        self_samples: Counter = Counter()
+        inclusive_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            self_samples[frames[-1]] += count
+            # A recursive function is counted once per sample.
+            for frame in set(frames):
+                inclusive_samples[frame] += count
+        
+        lines = [f"{total} samples across {self.profiles} profile(s)",
+                 f"{'self %':>8} {'total %':>8}  function"]
+        for frame, count in self_samples.most_common(limit):
+            lines.append(f"{100.0 * count / total:8.1f} "
+                         f"{100.0 * inclusive_samples[frame] / total:8.1f}  {frame}")
+        return "\n".join(lines)
+    
+    def write_report(self, output_dir: Path, limit: int = 25, collapsed: bool = False) -> str:
+        """Write the top-N report (and optionally merged stacks) to ``output_dir``."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report = self.top_functions(limit)
+        
+        with open(output_dir / 'hot_functions.txt', 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+        
+        if collapsed and self.mode == 'sampling':
+            write_collapsed(self.stacks, output_dir / 'batch.collapsed')
+        
+        return report
@@ -1,5 +1,4 @@
 import json
-import jsonschema
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
@@ -61,6 +60,8 @@ class SchemaValidator:
     
     def validate_data(self, data: Dict[str, Any]) -> Tuple[bool, List[str]]:
 
+        import jsonschema
+        
         errors = []
         
         try:
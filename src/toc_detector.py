@@ -0,0 +1,159 @@
+import re
+from typing import Dict, List, Any, Optional
+
+# Row text of a contents entry: the title, a dot leader, and a page number.
+_LEADER_ENTRY = re.compile(r'^(?P<text>.*?[^\s.·…_])\s*(?:[.·…_]\s*){3,}(?P<page>\d{1,4})$')
+# A span that ends in a dot leader, optionally followed by its page number.
+_LEADER_TAIL = re.compile(r'(?:[.·…_]\s*){3,}\d{0,4}$')
+_LEADER_CHARS = '.·…_'
+_NUMBERING = re.compile(r'^(?:\d+(?:\.\d+)*\.?|[IVX]+\.|[A-Z]\.)\s+')
+
+
+def _ends_in_leader(text: str) -> bool:
+    """Cheap test for a dot leader, possibly followed by a page number, at the end of ``text``."""
+    tail = text.rstrip('0123456789').rstrip() if text[-1].isdigit() else text
+    if len(tail) < 3 or tail[-1] not in _LEADER_CHARS:
+        return False
+    # Leaders may be spaced ('. . .'); an ordinary sentence ends in one period.
+    return tail[-2] in _LEADER_CHARS or (tail[-2] == ' ' and tail[-3] in _LEADER_CHARS)
+
+
+def normalize_heading(text: str) -> str:
+    return ' '.join(text.lower().split()).rstrip('. ')
+
+
+def strip_numbering(text: str) -> str:
+    return _NUMBERING.sub('', text.strip())
+
+
+def entry_key(text: str) -> str:
+    """A detected line without numbering, dot leader or trailing page number."""
+    text = text.strip()
+    # String stripping rather than a regex: a search for a trailing leader
+    # rescans the dots from every position of a long leader line.
+    core = text.rstrip('0123456789')
+    if 1 <= len(text) - len(core) <= 4:
+        title = core.rstrip(_LEADER_CHARS + ' \t')
+        leader = core[len(title):]
+        if len(leader) - leader.count(' ') - leader.count('\t') >= 3:
+            text = title
+        else:
+            text = core.rstrip()
+    return normalize_heading(strip_numbering(text))
+
+
+class TOCDetector:
+    """Recognise table-of-contents pages from dot leaders and page numbers.
+    
+    Spans are regrouped into visual rows by vertical position, because PDF
+    producers often emit the entry text, the leader dots and the page number
+    as separate blocks. A row counts as an entry if it ends in a page number
+    after a dot leader, or after a wide horizontal gap. Leaderless rows look
+    just like a two-column table, so they are only trusted when their targets
+    run in page order and stay within the document.
+    """
+    
+    def __init__(self, min_entries: int = 4, min_share: float = 0.3,
+                 row_tolerance: float = 3.0, min_gap: float = 50.0):
+        self.min_entries = min_entries
+        self.min_share = min_share
+        self.row_tolerance = row_tolerance
+        self.min_gap = min_gap
+    
+    def _screen(self, text_dict: Dict) -> bool:
+        """Cheap pre-check before rows are built: enough lines that could end an entry.
+        
+        Those end in a dot leader or are a distinct bare number; a running
+        page number repeated in headers and footers only counts once. Only
+        the last non-blank span of each line is read, as that is where both sit.
+        """
+        leaders = 0
+        numbers = set()
+        for block in text_dict.get('blocks', []):
+            for line in block.get('lines', []):
+                text = ''
+                for span in reversed(line.get('spans', [])):
+                    text = span.get('text', '').rstrip()
+                    if text:
+                        break
+                if not text or not (text[-1].isdigit() or text[-1] in _LEADER_CHARS):
+                    continue
+                if text.isdigit():
+                    if len(text) <= 4:
+                        numbers.add(text)
+                elif text[-1] in _LEADER_CHARS and text[-2:-1] not in _LEADER_CHARS + ' ':
+                    # A sentence's closing period, the common case on body pages.
+                    continue
+                elif _ends_in_leader(text) and _LEADER_TAIL.search(text):
+                    leaders += 1
+                else:
+                    continue
+                if leaders + len(numbers) >= self.min_entries:
+                    return True
+        return False
+    
+    def _rows(self, text_dict: Dict) -> List[Dict[str, Any]]:
+        spans = []
+        for block in text_dict.get('blocks', []):
+            for line in block.get('lines', []):
+                for span in line.get('spans', []):
+                    if not span.get('text', '').strip():
+                        continue
+                    x0, y0, x1, y1 = span.get('bbox', (0, 0, 0, 0))
+                    spans.append(((y0 + y1) / 2, x0, x1, span))
+        
+        spans.sort(key=lambda item: (item[0], item[1]))
+        
+        rows = []
+        for center, x0, x1, span in spans:
+            if rows and abs(rows[-1]['center'] - center) <= self.row_tolerance:
+                rows[-1]['spans'].append((x0, x1, span))
+            else:
+                rows.append({'center': center, 'spans': [(x0, x1, span)]})
+        
+        for row in rows:
+            row['spans'].sort(key=lambda item: item[0])
+        
+        return rows
+    
+    def _entry_from_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        spans = row['spans']
+        text = ' '.join(span.get('text', '').strip() for _, _, span in spans)
+        
+        match = _LEADER_ENTRY.match(text)
+        if match:
+            return {'text': match.group('text').strip(), 'target': int(match.group('page')),
+                    'leader': True}
+        
+        # Leaderless layout: right-aligned number well clear of the title.
+        last_text = spans[-1][2].get('text', '').strip()
+        if len(spans) > 1 and last_text.isdigit() and len(last_text) <= 4:
+            if spans[-1][0] - spans[-2][1] >= self.min_gap:
+                title = ' '.join(span.get('text', '').strip() for _, _, span in spans[:-1])
+                title = title.rstrip(' .·…_')
+                if len(title) >= 3:
+                    return {'text': title, 'target': int(last_text), 'leader': False}
+        
+        return None
+    
+    def detect(self, text_dict: Dict, page_count: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Return the page's contents entries if it is a contents page, else None.
+        
+        Each entry is ``{'text', 'target', 'leader'}``. ``page_count`` bounds
+        the targets of leaderless entries.
+        """
+        if not text_dict or 'blocks' not in text_dict or not self._screen(text_dict):
+            return None
+        
+        rows = self._rows(text_dict)
+        entries = [entry for entry in map(self._entry_from_row, rows) if entry is not None]
+        
+        leaderless = [entry['target'] for entry in entries if not entry['leader']]
+        if leaderless and (any(later < earlier for earlier, later in zip(leaderless, leaderless[1:]))
+                           or (page_count is not None and max(leaderless) > page_count)):
+            entries = [entry for entry in entries if entry['leader']]
+        
+        if len(entries) < self.min_entries or len(entries) < self.min_share * len(rows):
+            return None
+        
+        return entries
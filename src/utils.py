@@ -1,11 +1,119 @@
 import re
-from typing import Dict, List, Any, Set
+import os
+import json
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set
+
+# Pages sampled, evenly spread over the document, to fingerprint its template.
+TEMPLATE_SAMPLE_PAGES = 8
 
 
 class FontAnalyzer:
     
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = None):
+        # Template fingerprint -> {'levels': {font size: level}, 'documents': n}
         self.font_cache = {}
+        self.cache_path = cache_path
+        
+        if cache_path is not None:
+            self.font_cache.update(self._read_cache_file())
+    
+    def template_fingerprint(self, pages_content: List[Dict], min_share: float = 0.01,
+                             sample_pages: int = TEMPLATE_SAMPLE_PAGES) -> Optional[str]:
+        """Fingerprint a document's font set: font names and body/heading sizes.
+        
+        Fonts and sizes (rounded to half a point) carrying less than
+        ``min_share`` of the characters are ignored, so a stray symbol font or
+        footnote size does not split one corporate template into many. Only
+        ``sample_pages`` pages spread over the document are read, so the cost
+        does not grow with its length.
+        """
+        chars_by_font = Counter()
+        chars_by_size = Counter()
+        
+        if len(pages_content) > sample_pages:
+            step = len(pages_content) / sample_pages
+            pages_content = [pages_content[int(index * step)] for index in range(sample_pages)]
+        
+        for page_content in pages_content:
+            text_dict = page_content.get('text_dict', {})
+            for block in text_dict.get('blocks', []):
+                for line in block.get('lines', []):
+                    for span in line.get('spans', []):
+                        count = len(span.get('text', '').strip())
+                        if not count:
+                            continue
+                        chars_by_font[span.get('font', 'default')] += count
+                        chars_by_size[round(span.get('size', 0) * 2) / 2] += count
+        
+        total = sum(chars_by_size.values())
+        if not total:
+            return None
+        
+        fonts = sorted(font for font, count in chars_by_font.items() if count / total >= min_share)
+        sizes = sorted(size for size, count in chars_by_size.items() if count / total >= min_share)
+        
+        key = '|'.join(fonts) + '#' + ','.join(f'{size:g}' for size in sizes)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def get_template_levels(self, fingerprint: str) -> Optional[Dict[float, str]]:
+        entry = self.font_cache.get(fingerprint)
+        if entry is None:
+            return None
+        return dict(entry['levels'])
+    
+    def store_template_levels(self, fingerprint: str, levels: Dict[float, str]) -> None:
+        entry = self.font_cache.setdefault(fingerprint, {'levels': {}, 'documents': 0})
+        changed = entry['levels'] != levels
+        entry['levels'] = dict(levels)
+        entry['documents'] += 1
+        
+        # Only persist when a template is new or its mapping grew.
+        if changed and self.cache_path is not None:
+            self.save_cache()
+    
+    def _read_cache_file(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        # JSON object keys are strings; font sizes are restored to floats.
+        return {
+            fingerprint: {
+                'levels': {float(size): level for size, level in entry.get('levels', {}).items()},
+                'documents': entry.get('documents', 0)
+            }
+            for fingerprint, entry in raw.items()
+        }
+    
+    def save_cache(self) -> None:
+        """Merge the in-memory cache into the cache file and write it atomically.
+        
+        Several worker processes may share one file: each write re-reads it
+        first and replaces it in one rename, so a race can at worst drop a
+        concurrently learnt template, never corrupt the file.
+        """
+        merged = self._read_cache_file()
+        merged.update(self.font_cache)
+        
+        serialisable = {
+            fingerprint: {
+                'levels': {repr(size): level for size, level in entry['levels'].items()},
+                'documents': entry['documents']
+            }
+            for fingerprint, entry in merged.items()
+        }
+        
+        cache_path = Path(self.cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(serialisable, f, indent=2)
+        os.replace(temp_path, cache_path)
     
     def analyze_font_distribution(self, text_dict: Dict) -> Dict[str, Any]:
 